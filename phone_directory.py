@@ -1,15 +1,16 @@
 import argparse
-import dataclasses
-import json
+import bisect
+import collections
+import functools
 import logging
-import math
+import os
 import re
-import textwrap
+import sys
 from pathlib import Path
 
-from pydantic import ValidationError, field_validator
+from pydantic import TypeAdapter, ValidationError, model_validator
 from pydantic.dataclasses import dataclass
-from pydantic_core import PydanticCustomError
+from pydantic_core import InitErrorDetails, PydanticCustomError, from_json
 
 
 logging.basicConfig(filename="phone_directory.log",
@@ -20,8 +21,60 @@ logging.basicConfig(filename="phone_directory.log",
 
 log = logging.getLogger(__name__)
 
+_NAME_RE = re.compile(r'[a-zA-Zа-яёА-ЯЁ\s]+(?:-[a-zA-Zа-яёА-ЯЁ\s]+)?')
+# Any number of names separated by NUL, which no valid name contains.
+_NAMES_RE = re.compile(rf'(?:{_NAME_RE.pattern})(?:\x00(?:{_NAME_RE.pattern}))*')
+_NAME_FIELDS = ("last_name", "first_name", "middle_name", "organization")
+_PHONE_FIELDS = ("work_phone", "personal_phone")
+_FIELDS = _NAME_FIELDS + _PHONE_FIELDS
+_FIELD_SET = frozenset(_FIELDS)
+_SEARCH_CACHE_SIZE = 128
+_RECORD_TEMPLATE = (
+    "ID {index}\n"
+    "Last name: {record.last_name}\n"
+    "First name: {record.first_name}\n"
+    "Middle name: {record.middle_name}\n"
+    "Organization: {record.organization}\n"
+    "Work phone: {record.work_phone}\n"
+    "Personal phone: {record.personal_phone}"
+)
 
-@dataclass
+
+def _is_ascii_digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+def _is_phone_separator(char: str) -> bool:
+    return char in "-." or char.isspace()
+
+
+def _valid_phone(value: str) -> bool:
+    """
+    Checks the phone number format: [+][(]ddd[)][sep]ddd[sep]dddd[dd], where sep is "-", "." or whitespace.
+
+    Every part of the format is optional or fixed-width, so a single left-to-right pass is enough.
+    """
+    i = 0
+    if value.startswith("+", i):
+        i += 1
+    if value.startswith("(", i):
+        i += 1
+    if len(value) < i + 3 or not _is_ascii_digits(value[i:i + 3]):
+        return False
+    i += 3
+    if value.startswith(")", i):
+        i += 1
+    if i < len(value) and _is_phone_separator(value[i]):
+        i += 1
+    if len(value) < i + 3 or not _is_ascii_digits(value[i:i + 3]):
+        return False
+    i += 3
+    if i < len(value) and _is_phone_separator(value[i]):
+        i += 1
+    return 4 <= len(value) - i <= 6 and _is_ascii_digits(value[i:])
+
+
+@dataclass(slots=True)
 class Record:
     """
     Create Record object.
@@ -33,27 +86,108 @@ class Record:
     work_phone: str
     personal_phone: str
 
-    @field_validator("last_name", "first_name", "middle_name", "organization")
-    @classmethod
-    def validate_string_fields(cls, value):
-        pattern = r'^[a-zA-Zа-яА-Я\s]+(?:-[a-zA-Zа-яА-Я\s]+)?$'
-        if not re.match(pattern, value):
-            raise PydanticCustomError("Invalid data", "Invalid data. Please enter a valid data")
-        return value
+    @model_validator(mode="after")
+    def validate_fields(self):
+        """
+        Validates all fields in one call, reporting every invalid field under its own name.
+        """
+        errors = [
+            InitErrorDetails(
+                type=PydanticCustomError("Invalid data", "Invalid data. Please enter a valid data"),
+                loc=(field,),
+                input=getattr(self, field),
+            )
+            for field in _NAME_FIELDS
+            if not _NAME_RE.fullmatch(getattr(self, field))
+        ]
+        errors.extend(
+            InitErrorDetails(
+                type=PydanticCustomError("Invalid data", "Invalid phone number"),
+                loc=(field,),
+                input=getattr(self, field),
+            )
+            for field in _PHONE_FIELDS
+            if not _valid_phone(getattr(self, field))
+        )
+        if errors:
+            raise ValidationError.from_exception_data(type(self).__name__, errors)
+        return self
 
-    @field_validator("personal_phone", "work_phone")
     @classmethod
-    def validate_phone(cls, value):
-        pattern = r'^[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}$'
-        if not re.match(pattern, value):
-            raise PydanticCustomError("Invalid data", "Invalid phone number")
-        return value
+    def construct_unchecked(cls, **data: str) -> "Record":
+        """
+        Create Record object without running the field validators.
+
+        Only meant for data that was already validated before it was saved,
+        so only the value types are checked.
+        """
+        record = cls.__new__(cls)
+        for field in _FIELDS:
+            value = data[field]
+            if not isinstance(value, str):
+                raise TypeError(f"{field} must be a string, got {type(value).__name__}")
+            object.__setattr__(record, field, value)
+        return record
 
-class DataclassJSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        if dataclasses.is_dataclass(o):
-            return dataclasses.asdict(o)
-        return super().default(o)
+
+_RECORDS_ADAPTER = TypeAdapter(list[Record])
+
+
+def _valid_records_data(records_data: object) -> bool:
+    """
+    Checks all records parsed from the file at once.
+
+    Names of every record are joined and matched by a single regex call instead of one validator call per field.
+
+    :param records_data: Parsed JSON content of the file.
+    :return: True if every record has valid fields, False if any record needs the per-field validators.
+    """
+    if not isinstance(records_data, list):
+        return False
+    if not records_data:
+        return True
+    try:
+        names = "\x00".join(data[field] for data in records_data for field in _NAME_FIELDS)
+        phones = [data[field] for data in records_data for field in _PHONE_FIELDS]
+    except (KeyError, TypeError):
+        return False
+    if names.count("\x00") != len(records_data) * len(_NAME_FIELDS) - 1 or not _NAMES_RE.fullmatch(names):
+        return False
+    return all(isinstance(phone, str) and _valid_phone(phone) for phone in phones)
+
+
+def _search_blob(record: Record) -> str:
+    """
+    Joins the record fields into one lowercased string for substring search.
+
+    Fields are separated by the unit separator so a query can't match across two fields.
+    """
+    return "\x1f".join(getattr(record, field) for field in _FIELDS).lower()
+
+
+class _RecordList(list):
+    """
+    List of records that counts its own modifications, so the search caches can tell when they are stale.
+    """
+    version = 0
+
+
+def _counting_modification(name: str):
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def modify(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return modify
+
+
+for _name in (
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+    "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+):
+    setattr(_RecordList, _name, _counting_modification(_name))
 
 
 class PhoneDirectory:
@@ -61,10 +195,92 @@ class PhoneDirectory:
     Initializes the PhoneDirectory object.
 
     :param file_path: Path to the file where phone directory records are stored.
+    :param validate_on_load: Run the field validators on records read from the file.
+    :param autosave: Save the file after every change; otherwise changes are kept until flush() is called.
     """
-    def __init__(self, file_path: str = "phone_directory.json") -> None:
+    def __init__(
+        self,
+        file_path: str = "phone_directory.json",
+        validate_on_load: bool = False,
+        autosave: bool = True,
+    ) -> None:
         self.file_path = Path(file_path)
-        self.records = self.load_records()
+        self.validate_on_load = validate_on_load
+        self.autosave = autosave
+        # Success messages of changes that are not written to the file yet.
+        self._unsaved_changes: list[str] = []
+        self._field_indexes: dict[str, dict[str, list[int]]] = {}
+        self._search_cache: dict[str, list[Record]] = {}
+        self._records: _RecordList | None = None
+        # Version of the records list the search caches were built for, used to spot changes
+        # made to the list directly instead of through add_record/edit_record.
+        self._indexed_version = 0
+
+    @property
+    def records(self) -> list[Record]:
+        """
+        Records of the phone directory, read from the file on first access.
+
+        Assigning a new list or changing this one in place resets the search caches.
+
+        :return: List of Record objects.
+        """
+        if self._records is None:
+            self._records = _RecordList(self.load_records())
+        return self._records
+
+    @records.setter
+    def records(self, records: list[Record]) -> None:
+        self._records = _RecordList(records)
+        self._reset_search_caches()
+
+    def _reset_search_caches(self) -> None:
+        self.__dict__.pop("_search_blobs", None)
+        self._field_indexes.clear()
+        self._search_cache.clear()
+        self._indexed_version = self.records.version
+
+    def _check_search_caches(self) -> None:
+        if self.records.version != self._indexed_version:
+            self._reset_search_caches()
+
+    @functools.cached_property
+    def _search_blobs(self) -> list[str]:
+        return [_search_blob(record) for record in self.records]
+
+    def _field_index(self, field: str) -> dict[str, list[int]]:
+        """
+        Returns the index of lowercased field values to record positions, building it on first use.
+
+        :param field: Name of the Record field.
+        :return: Mapping of lowercased value to sorted record indices.
+        """
+        field_index = self._field_indexes.get(field)
+        if field_index is None:
+            field_index = self._field_indexes[field] = collections.defaultdict(list)
+            for i, record in enumerate(self.records):
+                field_index[getattr(record, field).lower()].append(i)
+        return field_index
+
+    def _unindex_record(self, index: int) -> None:
+        record = self.records[index]
+        for field, field_index in self._field_indexes.items():
+            try:
+                field_index[getattr(record, field).lower()].remove(index)
+            except ValueError:
+                # The indexes don't match the records; drop them and rebuild on the next query.
+                self._field_indexes.clear()
+                return
+
+    def _index_record(self, index: int) -> None:
+        record = self.records[index]
+        for field, field_index in self._field_indexes.items():
+            bisect.insort(field_index[getattr(record, field).lower()], index)
+        if "_search_blobs" in self.__dict__:
+            if index == len(self._search_blobs):
+                self._search_blobs.append(_search_blob(record))
+            else:
+                self._search_blobs[index] = _search_blob(record)
 
     def load_records(self) -> list[Record]:
         """
@@ -73,30 +289,70 @@ class PhoneDirectory:
         :return: List of Record objects.
         """
         try:
-            with self.file_path.open("r") as file:
-                records_data = json.load(file)
-                records = [Record(**data) for data in records_data]
-                return records
+            records_data = from_json(self.file_path.read_bytes())
+            if self.validate_on_load and not _valid_records_data(records_data):
+                # Let the field validators report which records are invalid.
+                return _RECORDS_ADAPTER.validate_python(records_data)
+            if not isinstance(records_data, list):
+                log.error("Validation error in the data: the file must contain a list of records.")
+                return []
+            # Replace the parsed dicts in place, so each is freed as soon as its record exists
+            # instead of keeping both full representations alive until the end of the load.
+            for i, data in enumerate(records_data):
+                records_data[i] = Record.construct_unchecked(**data)
+            return records_data
         except FileNotFoundError:
             return []
-        except json.JSONDecodeError:
-            log.error("Error decoding JSON in the file. Please check the file format.")
-            return []
         except ValidationError as e:
             log.error(f"Validation error in the data: {e}")
             return []
+        except ValueError:
+            log.error("Error decoding JSON in the file. Please check the file format.")
+            return []
+        except (KeyError, TypeError) as e:
+            log.error(f"Validation error in the data: {e!r}")
+            return []
 
     def save_records(self) -> None:
         """
-        Saves records to the file.
+        Saves records to the file and reports the changes that were saved.
+
+        :return: None
+        """
+        # Write next to the target and swap it in, so an interrupted save never leaves a truncated file.
+        tmp_path = self.file_path.with_name(f"{self.file_path.name}.tmp")
+        try:
+            tmp_path.write_bytes(_RECORDS_ADAPTER.dump_json(self.records, indent=2))
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        for message in self._unsaved_changes:
+            print(message)
+        self._unsaved_changes.clear()
+
+    def flush(self) -> None:
+        """
+        Saves records to the file if they were changed since the last save.
 
         :return: None
         """
-        records_data = [dataclasses.asdict(record) for record in self.records]
-        with self.file_path.open("w") as file:
-            json.dump(records_data, file, indent=2, cls=DataclassJSONEncoder)
+        if self._unsaved_changes:
+            self.save_records()
 
-    def display_records(self, records: list[Record] = None, entries_per_page: int = 5, page_number: int = 1) -> None:
+    def _records_changed(self, message: str) -> None:
+        """
+        Registers a change of the records, saving it right away when autosave is on.
+
+        :param message: Message printed once the change is written to the file.
+        :return: None
+        """
+        self._search_cache.clear()
+        self._unsaved_changes.append(message)
+        if self.autosave:
+            self.save_records()
+
+    def display_records(self, records: list[Record] | None = None, entries_per_page: int = 5, page_number: int = 1) -> None:
         """
         Displays records on the screen with pagination.
 
@@ -105,26 +361,18 @@ class PhoneDirectory:
         :param page_number: Page number to display.
         :return: None
         """
-        records_to_display = records or self.records
+        records_to_display = self.records if records is None else records
+        total_pages = (len(records_to_display) + entries_per_page - 1) // entries_per_page
         start_index = (page_number - 1) * entries_per_page
         end_index = start_index + entries_per_page
         current_page_records = records_to_display[start_index:end_index]
 
-        for index, record in enumerate(current_page_records, start=start_index + 1):
-            formatted_text = f"""
-            ID {index}
-            Last name: {record.last_name}
-            First name: {record.first_name}
-            Middle name: {record.middle_name}
-            Organization: {record.organization}
-            Work phone: {record.work_phone}
-            Personal phone: {record.personal_phone}
-            """
-
-            formatted_text = textwrap.dedent(formatted_text).strip()
-            print(formatted_text)
-
-        print(f"Page {page_number}/{math.ceil(len(records_to_display) / entries_per_page)}")
+        lines = [
+            _RECORD_TEMPLATE.format(index=index, record=record)
+            for index, record in enumerate(current_page_records, start=start_index + 1)
+        ]
+        lines.append(f"Page {page_number}/{total_pages}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def add_record(self, record: Record) -> None:
         """
@@ -134,9 +382,11 @@ class PhoneDirectory:
         :return: None
         """
         try:
+            self._check_search_caches()
             self.records.append(record)
-            self.save_records()
-            print("Entry added successfully.")
+            self._indexed_version = self.records.version
+            self._index_record(len(self.records) - 1)
+            self._records_changed("Entry added successfully.")
         except ValidationError as e:
             log.error(f"Failed to add entry: {e}")
 
@@ -151,24 +401,26 @@ class PhoneDirectory:
             record = self.records[index]
 
             print("Current values:")
-            for key, value in dataclasses.asdict(record).items():
-                formatted_key = key.replace('_', ' ').capitalize()
-                print(f"{formatted_key}: {value}")
+            for field in _FIELDS:
+                formatted_key = field.replace('_', ' ').capitalize()
+                print(f"{formatted_key}: {getattr(record, field)}")
 
             print("Choose a field to edit:")
-            for i, field in enumerate(dataclasses.asdict(record).keys(), start=1):
+            for i, field in enumerate(_FIELDS, start=1):
                 formatted_field = field.replace('_', ' ')
                 print(f"{i}. {formatted_field.capitalize()}")
 
             try:
                 selected_field_index = int(input("Enter the number of the field to edit: ")) - 1
-                selected_field = list(dataclasses.asdict(record).keys())[selected_field_index]
+                selected_field = _FIELDS[selected_field_index]
 
                 new_value = input(f"Enter the new value for {selected_field.capitalize()}: ")
+                self._check_search_caches()
+                self._unindex_record(index)
                 setattr(record, selected_field, new_value)
+                self._index_record(index)
 
-                self.save_records()
-                print("Entry edited successfully.")
+                self._records_changed("Entry edited successfully.")
             except (ValidationError, IndexError):
                 log.exception("Invalid input. Please enter a valid field number.")
                 print("Invalid input. Please enter a valid field number.")
@@ -179,30 +431,41 @@ class PhoneDirectory:
     def search_records(self, query: str) -> list[Record]:
         """
         Searches for records in the phone directory based on the given query.
+        Results are cached per query until a record is added or edited.
 
         :param query: Search query string.
         :return: List of records matching the query.
         """
-        results = []
-        if "=" in query.lower():
-            field, value = query.split("=")
-            for record in self.records:
-                if not hasattr(record, field):
-                    print(f"Field '{field}' does not exist.")
-                    log.error(f"Field '{field}' does not exist.")
-                    return results
-                if getattr(record, field).lower() == value.lower():
-                    results.append(record)
+        self._check_search_caches()
 
-        else:
-            for record in self.records:
-                if any(query.lower() in value.lower() for value in dataclasses.asdict(record).values()):
-                    results.append(record)
-        return results
+        if "=" in query:
+            field = query.split("=", 1)[0]
+            if field not in _FIELD_SET:
+                print(f"Field '{field}' does not exist.")
+                log.error(f"Field '{field}' does not exist.")
+                return []
+
+        # Least recently used queries are evicted first: hits move to the end of the dict.
+        results = self._search_cache.pop(query, None)
+        if results is None:
+            if len(self._search_cache) >= _SEARCH_CACHE_SIZE:
+                del self._search_cache[next(iter(self._search_cache))]
+            results = self._find_records(query)
+        self._search_cache[query] = results
+        return list(results)
+
+    def _find_records(self, query: str) -> list[Record]:
+        if "=" in query:
+            field, value = query.split("=", 1)
+            return [self.records[i] for i in self._field_index(field).get(value.lower(), [])]
+
+        query = query.lower()
+        return [self.records[i] for i, blob in enumerate(self._search_blobs) if query in blob]
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Phone Directory Management")
+    parser.add_argument("--validate-on-load", action="store_true", help="Validate records read from the file")
     sub_parser = parser.add_subparsers(dest="command")
     display = sub_parser.add_parser("display", help="Display all records")
     display.add_argument("--page", "-p", type=int, default=1, help="Page number for display")
@@ -222,13 +485,13 @@ def parse_arguments():
 
 
 def main():
-    phone_directory = PhoneDirectory()
-
     args = parse_arguments()
 
+    phone_directory = PhoneDirectory(validate_on_load=args.validate_on_load, autosave=False)
+
     match args.command:
         case "display":
-            phone_directory.display_records(page_number=args.page, entries_per_page=args.entries_per_page)
+            phone_directory.display_records(page_number=args.page, entries_per_page=args.records_per_page)
         case "add":
             try:
                 new_record = Record(
@@ -248,7 +511,18 @@ def main():
         case "search":
             search_query = args.query
             search_results = phone_directory.search_records(search_query)
-            phone_directory.display_records(search_results) if search_results else print("No results found.")
+            if search_results:
+                phone_directory.display_records(
+                    search_results, page_number=args.page, entries_per_page=args.records_per_page
+                )
+            else:
+                print("No results found.")
+
+    try:
+        phone_directory.flush()
+    except OSError as e:
+        log.exception(f"Failed to save changes: {e}")
+        print(f"Failed to save changes: {e}")
 
 
 if __name__ == "__main__":
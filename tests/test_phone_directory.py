@@ -1,3 +1,4 @@
+import dataclasses
 import json
 from unittest.mock import patch
 
@@ -8,6 +9,16 @@ from pydantic import ValidationError
 from phone_directory import Record, PhoneDirectory
 
 
+PERSON = {
+    "last_name": "Соколов",
+    "first_name": "Сергей",
+    "middle_name": "Анатольевич",
+    "organization": "СберБанк",
+    "work_phone": "495-555-6666",
+    "personal_phone": "916-666-7777",
+}
+
+
 @pytest.mark.parametrize(
     ("person", "expected_result"),
     [
@@ -317,6 +328,11 @@ def test_phone_directory_edit(
             "test_phone_directory.json",
             [],
         ),
+        (
+            "first_name=андрей=",
+            "test_phone_directory.json",
+            [],
+        ),
         (
             "андрей",
             "test_phone_directory.json",
@@ -336,4 +352,217 @@ def test_phone_directory_edit(
 def test_phone_directory_search(query: str, file_path: str, expected_result: list[Record]) -> None:
     phone_directory = PhoneDirectory(file_path=file_path)
     result = phone_directory.search_records(query)
-    assert result == expected_result
\ No newline at end of file
+    assert result == expected_result
+
+
+@pytest.mark.parametrize(
+    ("file_path",),
+    [
+        ("phone_directory.json",),
+    ],
+)
+def test_phone_directory_validate_on_load(file_path: str) -> None:
+    unchecked = PhoneDirectory(file_path=file_path)
+    validated = PhoneDirectory(file_path=file_path, validate_on_load=True)
+    assert unchecked.records == validated.records
+
+
+def test_phone_directory_search_after_add(tmp_path: Path) -> None:
+    phone_directory = PhoneDirectory(file_path=str(tmp_path / "phone_directory.json"))
+    assert phone_directory.search_records("соколов") == []
+    record = Record(**PERSON)
+    phone_directory.add_record(record)
+    assert phone_directory.search_records("соколов") == [record]
+
+
+def test_phone_directory_search_by_field_after_edit(tmp_path: Path) -> None:
+    phone_directory = PhoneDirectory(file_path=str(tmp_path / "phone_directory.json"))
+    record = Record(**PERSON)
+    phone_directory.add_record(record)
+    assert phone_directory.search_records("first_name=сергей") == [record]
+    with patch("builtins.input", side_effect=["2", "Андрей"]):
+        phone_directory.edit_record(0)
+    assert phone_directory.search_records("first_name=сергей") == []
+    assert phone_directory.search_records("first_name=андрей") == [record]
+
+
+@pytest.mark.parametrize(
+    ("phone", "is_valid"),
+    [
+        ("495-555-6666", True),
+        ("4955556666", True),
+        ("+(495) 555.666666", True),
+        ("(495)555 6666", True),
+        ("495-555-666", False),
+        ("495-555-6666666", False),
+        ("495--555-6666", False),
+        ("++495-555-6666", False),
+        ("495-555-6666\n", False),
+        ("٤٩٥-555-6666", False),
+    ],
+)
+def test_phone_directory_validation_phone(phone: str, is_valid: bool) -> None:
+    person = {**PERSON, "work_phone": phone}
+    if is_valid:
+        assert Record(**person).work_phone == phone
+    else:
+        with pytest.raises(ValidationError):
+            Record(**person)
+
+
+def test_phone_directory_search_after_edit(tmp_path: Path) -> None:
+    phone_directory = PhoneDirectory(file_path=str(tmp_path / "phone_directory.json"))
+    record = Record(**PERSON)
+    phone_directory.add_record(record)
+    assert phone_directory.search_records("серг") == [record]
+    with patch("builtins.input", side_effect=["2", "Андрей"]):
+        phone_directory.edit_record(0)
+    assert phone_directory.search_records("серг") == []
+    assert phone_directory.search_records("андр") == [record]
+
+
+@pytest.mark.parametrize(
+    ("name", "is_valid"),
+    [
+        ("Фёдоров", True),
+        ("ЁЛКИН", True),
+        ("Римский-Корсаков", True),
+        ("Smith", True),
+        ("Римский-Корсаков-Второй", False),
+        ("-Фёдоров", False),
+        ("Фёдоров1", False),
+        ("", False),
+    ],
+)
+def test_phone_directory_validation_name(name: str, is_valid: bool) -> None:
+    person = {**PERSON, "last_name": name}
+    if is_valid:
+        assert Record(**person).last_name == name
+    else:
+        with pytest.raises(ValidationError):
+            Record(**person)
+
+
+def test_phone_directory_flush(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    path = tmp_path / "phone_directory.json"
+    phone_directory = PhoneDirectory(file_path=str(path), autosave=False)
+    record = Record(**PERSON)
+    phone_directory.add_record(record)
+    assert not path.exists()
+    assert capsys.readouterr().out == ""
+    phone_directory.flush()
+    assert capsys.readouterr().out == "Entry added successfully.\n"
+    assert PhoneDirectory(file_path=str(path)).records == [record]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_phone_directory_flush_failure(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    path = tmp_path / "phone_directory.json"
+    phone_directory = PhoneDirectory(file_path=str(path), autosave=False)
+    record = Record(**PERSON)
+    phone_directory.add_record(record)
+    with patch("os.replace", side_effect=OSError("disk full")), pytest.raises(OSError):
+        phone_directory.flush()
+    assert capsys.readouterr().out == ""
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    ("file_path",),
+    [
+        ("phone_directory.json",),
+    ],
+)
+def test_phone_directory_search_after_records_change(file_path: str) -> None:
+    phone_directory = PhoneDirectory(file_path=file_path)
+    assert phone_directory.search_records("газпром")
+    assert phone_directory.search_records("organization=газпром")
+    phone_directory.records = phone_directory.records[:2]
+    assert phone_directory.search_records("газпром") == phone_directory.records[1:2]
+    assert phone_directory.search_records("organization=газпром") == phone_directory.records[1:2]
+    phone_directory.records.pop()
+    assert phone_directory.search_records("газпром") == []
+    assert phone_directory.search_records("organization=газпром") == []
+
+
+def test_phone_directory_load_non_string_value(tmp_path: Path) -> None:
+    path = tmp_path / "phone_directory.json"
+    path.write_text(json.dumps([{**PERSON, "last_name": 1}]))
+    phone_directory = PhoneDirectory(file_path=str(path))
+    assert phone_directory.records == []
+    assert phone_directory.search_records("сергей") == []
+
+
+@pytest.mark.parametrize(
+    ("field", "value", "expected_loc"),
+    [
+        ("first_name", "1", "1.first_name"),
+        ("last_name", "Соколов\x00Сергей", "1.last_name"),
+        ("personal_phone", "тест", "1.personal_phone"),
+    ],
+)
+def test_phone_directory_validate_on_load_invalid(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+    field: str,
+    value: str,
+    expected_loc: str,
+) -> None:
+    path = tmp_path / "phone_directory.json"
+    path.write_text(json.dumps([PERSON, {**PERSON, field: value}, PERSON]))
+    phone_directory = PhoneDirectory(file_path=str(path), validate_on_load=True)
+    assert phone_directory.records == []
+    assert f"\n{expected_loc}\n" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ("file_path",),
+    [
+        ("phone_directory.json",),
+    ],
+)
+def test_phone_directory_search_cache(file_path: str) -> None:
+    phone_directory = PhoneDirectory(file_path=file_path)
+    with patch.object(phone_directory, "_find_records", wraps=phone_directory._find_records) as find_records:
+        first = phone_directory.search_records("газпром")
+        assert phone_directory.search_records("газпром") == first
+        assert find_records.call_count == 1
+
+        phone_directory.search_records("0")
+        for query in range(1, 128):
+            phone_directory.search_records(str(query))
+            phone_directory.search_records("0")
+        phone_directory.search_records("128")
+        assert "0" in phone_directory._search_cache
+        assert "газпром" not in phone_directory._search_cache
+
+
+def test_phone_directory_edit_after_records_change(tmp_path: Path) -> None:
+    path = tmp_path / "phone_directory.json"
+    path.write_bytes(Path("phone_directory.json").read_bytes())
+    phone_directory = PhoneDirectory(file_path=str(path))
+    assert phone_directory.search_records("first_name=алексей")
+    phone_directory.records.pop(0)
+    with patch("builtins.input", side_effect=["2", "Тест"]):
+        phone_directory.edit_record(0)
+    assert phone_directory.records[0].first_name == "Тест"
+    assert phone_directory.search_records("first_name=тест") == phone_directory.records[:1]
+    assert phone_directory.search_records("first_name=алексей") == []
+
+
+@pytest.mark.parametrize(
+    ("file_path",),
+    [
+        ("phone_directory.json",),
+    ],
+)
+def test_phone_directory_search_after_same_length_change(file_path: str) -> None:
+    phone_directory = PhoneDirectory(file_path=file_path)
+    assert len(phone_directory.search_records("газпром")) == 3
+    assert len(phone_directory.search_records("organization=газпром")) == 3
+    removed = phone_directory.records.pop(1)
+    phone_directory.records.append(dataclasses.replace(removed, organization="Лукойл"))
+    expected = [record for record in phone_directory.records if record.organization == "ГазПром"]
+    assert len(expected) == 2
+    assert phone_directory.search_records("газпром") == expected
+    assert phone_directory.search_records("organization=газпром") == expected